@@ -13,6 +13,27 @@ class AddonProperties(bpy.types.PropertyGroup):
         default="Default Value"
     )
 
+# EnumProperty item lists, rebuilt once per depsgraph update instead of on every redraw.
+# Holding the lists here also keeps the item strings alive, which Blender requires.
+_enum_items_cache = {}
+
+def cached_enum_items(key, build):
+    items = _enum_items_cache.get(key)
+    if items is None:
+        items = _enum_items_cache[key] = build()
+    return items
+
+@bpy.app.handlers.persistent
+def clear_enum_items_cache(*args):
+    _enum_items_cache.clear()
+
+_cache_handlers = (
+    bpy.app.handlers.depsgraph_update_post,
+    bpy.app.handlers.load_post,
+    bpy.app.handlers.undo_post,
+    bpy.app.handlers.redo_post,
+)
+
 def cleanse_modules():
     for module_name in sorted(sys.modules.keys()):
 
@@ -22,8 +43,14 @@ def cleanse_modules():
 def register():
     bpy.utils.register_class(AddonProperties)
     bpy.types.Scene.my_addon_props = bpy.props.PointerProperty(type=AddonProperties)
+    for handler in _cache_handlers:
+        handler.append(clear_enum_items_cache)
 
 def unregister():
+    for handler in _cache_handlers:
+        if clear_enum_items_cache in handler:
+            handler.remove(clear_enum_items_cache)
+    _enum_items_cache.clear()
     bpy.utils.unregister_class(AddonProperties)
     del bpy.types.Scene.my_addon_props
     cleanse_modules()
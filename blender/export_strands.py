@@ -0,0 +1,329 @@
+# Heavy part of the strands exporter, loaded on first operator execution
+import bpy
+import struct
+from collections import namedtuple
+from time import time
+import mathutils
+import numpy as np
+
+from ..strands.format import build_lod, encode_strands, select_curves
+from ..strands.spatial import StrandGrid, is_closed_mesh, strands_in_uv_rect
+from ..strands.profiles import (auto_radii, random_uv_map, seed_for,
+                                RADIUS_HIGH_STREAM, RADIUS_LOW_STREAM, UV_STREAM)
+
+# Strand selection applied to every exported LOD. hidden_mesh/crop_mesh are
+# (vertices, triangles) or None, cull_inside is False for an open hidden mesh
+# (margin only), uv_rect is ((u, v) min, (u, v) max) or None. crop_mode is
+# "ROOT" (root inside crop_mesh) or "INTERSECT" (any point inside or any
+# segment crossing it). crop_invert keeps the strands the crop would drop, so
+# two exports with and without it partition the groom.
+Regions = namedtuple("Regions", ["hidden_mesh", "cull_inside", "cull_margin",
+                                 "crop_mesh", "crop_mode", "uv_rect", "crop_invert"])
+
+def timed(func):
+    def inner(*args, **kwargs):
+        t0 = time()
+        obj_name = bpy.data.objects[args[0]].name if args else 'Unknown Object'
+        result = func(*args, **kwargs)
+        elapsed = time() - t0
+        print(f'Hair strand "{obj_name}" exported in {elapsed:.5f} seconds')
+        return result
+    return inner
+
+def convert_curves_to_curve(source_curves_name):
+    source_curves = bpy.data.objects.get(source_curves_name)
+    if not source_curves or source_curves.type != 'CURVES':
+        print(f"Object '{source_curves_name}' is not a valid CURVES object.")
+        return None
+    bpy.context.view_layer.objects.active = source_curves
+    source_curves.select_set(True)
+    bpy.ops.object.convert(target='CURVE')
+    print(f"Temporary CURVE object '{source_curves.name}' created.")
+    return source_curves
+
+def read_curves(curve):
+    # Flat copies of the CURVES data: (N, 3) positions, (N,) radius or None, (C + 1,) curve offsets
+    data = curve.data
+    num_points = len(data.points)
+    positions = np.empty(num_points * 3, dtype=np.float32)
+    data.attributes["position"].data.foreach_get("vector", positions)
+    sizes = np.empty(len(data.curves), dtype=np.int64)
+    data.curves.foreach_get("points_length", sizes)
+    offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=offsets[1:])
+    radii = None
+    if "radius" in data.attributes and num_points:
+        radii = np.empty(num_points, dtype=np.float32)
+        data.attributes["radius"].data.foreach_get("value", radii)
+    return positions.reshape(-1, 3), radii, offsets
+
+def mesh_triangles(context, obj):
+    # World-space (V, 3) vertices and (T, 3) triangle indices of the evaluated mesh
+    depsgraph = context.evaluated_depsgraph_get()
+    obj_eval = obj.evaluated_get(depsgraph)
+    mesh = obj_eval.to_mesh()
+    mesh.calc_loop_triangles()
+    vertices = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", vertices)
+    triangles = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+    mesh.loop_triangles.foreach_get("vertices", triangles)
+    matrix = np.array(obj_eval.matrix_world, dtype=np.float64)
+    obj_eval.to_mesh_clear()
+    vertices = vertices.reshape(-1, 3) @ matrix[:3, :3].T + matrix[:3, 3]
+    return vertices, triangles.reshape(-1, 3)
+
+def region_mask(world_positions, offsets, regions, root_uv=None):
+    # Strands to keep after cropping to a mesh volume and/or UV rectangle and culling hidden ones
+    cropped = np.ones(len(offsets) - 1, dtype=bool)
+    if regions.uv_rect is not None and root_uv is not None:
+        cropped &= strands_in_uv_rect(root_uv, *regions.uv_rect)
+    hidden_mesh = regions.hidden_mesh
+    cull_near = hidden_mesh is not None and regions.cull_margin > 0
+    cull_inside = hidden_mesh is not None and regions.cull_inside
+    grid = None
+    if cull_near or cull_inside or regions.crop_mesh is not None:
+        grid = StrandGrid(world_positions, offsets)
+    if regions.crop_mesh is not None:
+        inside = grid.points_inside_mesh(*regions.crop_mesh)
+        if regions.crop_mode == "INTERSECT":
+            cropped &= grid.strands_where(inside | grid.segments_crossing_mesh(*regions.crop_mesh), "any")
+        else:
+            cropped &= grid.strands_where(inside, "root")
+    keep = ~cropped if regions.crop_invert else cropped
+    if cull_near or cull_inside:
+        hidden = np.zeros(len(world_positions), dtype=bool)
+        if cull_inside:
+            hidden |= grid.points_inside_mesh(*hidden_mesh)
+        if cull_near:
+            hidden |= grid.points_near_mesh(*hidden_mesh, regions.cull_margin)
+        keep &= ~grid.strands_where(hidden, "all")
+    return keep
+
+def strand_order(offsets, invert_roots):
+    num_points = int(offsets[-1])
+    if not invert_roots:
+        return np.arange(num_points)
+    sizes = np.diff(offsets)
+    return np.repeat(offsets[:-1] + offsets[1:] - 1, sizes) - np.arange(num_points)
+
+@timed
+def write_strands(curve_object, auto_radius, enable_physic, invert_roots, seed,
+                  regions=None, radius_shape="NOISE"):
+    """Encode one CURVES object as a LOD.
+
+    Returns the LOD, world-space hair roots and the mask of source curves
+    that were kept (strands with fewer than two points are dropped, as are
+    strands culled or cropped away by regions). The UV rectangle is only
+    applied when the curves carry surface_uv_coordinate. Auto width uses
+    radius_shape and seed (see seed_for), so the same input always gives
+    the same output.
+    """
+    curve = bpy.data.objects.get(curve_object)
+    if curve.type != 'CURVES':
+        lod = build_lod(np.empty((0, 3)), np.empty(0), np.zeros(1, dtype=np.int64), enable_physic)
+        return lod, [], np.zeros(0, dtype=bool)
+
+    positions, radii, offsets = read_curves(curve)
+    order = strand_order(offsets, invert_roots)
+    positions = positions[order]
+    if radii is not None:
+        radii = radii[order]
+
+    # Strands with fewer than two points can't form a segment. They are dropped
+    # entirely, so point_curves and guide curve indices count exported strands
+    # only and stay below the root count (the old exporter kept the source
+    # curve index there, pointing past the last root).
+    curve_mask = np.diff(offsets) >= 2
+    offsets, positions, radii = select_curves(offsets, curve_mask, positions, radii)
+
+    # Transform raw positions to world space.
+    matrix = np.array(curve.matrix_world, dtype=np.float64)
+    world_positions = positions @ matrix[:3, :3].T + matrix[:3, 3]
+
+    if regions is not None:
+        root_uv = None
+        if regions.uv_rect is not None and "surface_uv_coordinate" in curve.data.attributes:
+            root_uv = read_uv_map(curve, curve_mask)
+        keep = region_mask(world_positions, offsets, regions, root_uv)
+        curve_mask[np.flatnonzero(curve_mask)[~keep]] = False
+        offsets, positions, world_positions, radii = select_curves(
+            offsets, keep, positions, world_positions, radii)
+        print(f'Hair strand "{curve.name}": {int(np.count_nonzero(~keep))} strands culled')
+
+    if auto_radius or radii is None:
+        radii = auto_radii(offsets, seed, radius_shape)
+    hair_roots = world_positions[offsets[:-1]]
+
+    # Conversion: (x, z, -y)
+    game_positions = np.column_stack((positions[:, 0], positions[:, 2], -positions[:, 1]))
+    lod = build_lod(game_positions, radii, offsets, enable_physic)
+    return lod, hair_roots.tolist(), curve_mask
+
+def read_uv_map(obj, curve_mask):
+    attribute = obj.data.attributes["surface_uv_coordinate"]
+    uv = np.empty(len(attribute.data) * 2, dtype=np.float32)
+    attribute.data.foreach_get("vector", uv)
+    return uv.reshape(-1, 2)[:len(curve_mask)][curve_mask]
+
+def write_sbd(operator, context, High_obj, hair_roots, filepath):
+    # Use surface mesh from High LOD curves: object.data.surface
+    surface_obj = getattr(High_obj.data, "surface", None)
+    if not surface_obj:
+        operator.report({'ERROR'}, "Surface mesh not selected. Please select a surface mesh in the Data tab for curves.")
+        return False
+    sbd_file = bytearray()
+    sbd_file.extend(struct.pack('4s4x', 'SDBD'.encode('utf-8')))
+    num_entries = len(hair_roots)
+    sbd_file.extend(struct.pack('I', num_entries * 20))
+
+    depsgraph = context.evaluated_depsgraph_get()
+    surface_eval = surface_obj.evaluated_get(depsgraph)
+    mesh = surface_eval.to_mesh()
+
+    num_verts = len(mesh.vertices)
+    kd_vert = mathutils.kdtree.KDTree(num_verts)
+    for i, v in enumerate(mesh.vertices):
+        co_world = v.co
+        kd_vert.insert(co_world, i)
+    kd_vert.balance()
+
+    # Build a KD‑tree for face centers.
+    num_faces = len(mesh.polygons)
+    kd_face = mathutils.kdtree.KDTree(num_faces)
+    for poly in mesh.polygons:
+        kd_face.insert(poly.center, poly.index)
+    kd_face.balance()
+
+    vertex_uv = {}
+    if mesh.uv_layers.active:
+        uv_layer = mesh.uv_layers.active.data
+        uv_dict = {i: [] for i in range(num_verts)}
+        for loop in mesh.loops:
+            uv_dict[loop.vertex_index].append(uv_layer[loop.index].uv[:])
+        for idx, uv_list in uv_dict.items():
+            if uv_list:
+                avg_u = sum(uv[0] for uv in uv_list) / len(uv_list)
+                avg_v = sum(uv[1] for uv in uv_list) / len(uv_list)
+                vertex_uv[idx] = (avg_u, avg_v)
+            else:
+                vertex_uv[idx] = (0.0, 0.0)
+    else:
+        for i in range(num_verts):
+            vertex_uv[i] = (0.0, 0.0)
+
+    # For each hair root, find the closest face using the face KD‑tree.
+    for root in hair_roots:
+        co, face_index, dist = kd_face.find(root)
+        poly = mesh.polygons[face_index]
+        if poly and len(poly.vertices) >= 3:
+            verts = list(poly.vertices)[:3]
+            verts_multiplied = [int(idx * 12) for idx in verts]
+            uvs = [vertex_uv.get(idx, (0.0, 0.0)) for idx in verts]
+            avg_u = sum(uv[0] for uv in uvs) / 3.0
+            avg_v = sum(uv[1] for uv in uvs) / 3.0
+            sbd_file.extend(struct.pack("<3I2f",
+                                        verts_multiplied[0],
+                                        verts_multiplied[1],
+                                        verts_multiplied[2],
+                                        avg_u, avg_v))
+        else:
+            sbd_file.extend(struct.pack("<3I2f",
+                                        0,
+                                        0,
+                                        0,
+                                        -1, -1))
+
+    sbd_filepath = filepath.replace('_strand.strands.20', '.sbd.7')
+    with open(sbd_filepath, 'wb') as sbd:
+        sbd.write(sbd_file)
+    surface_eval.to_mesh_clear()
+    return True
+
+def save(operator, context):
+    collection = bpy.data.collections.get(operator.targetCollection)
+    if not collection:
+        operator.report({'ERROR'}, "Collection not found.")
+        return {'CANCELLED'}
+    High_obj = bpy.data.objects.get(operator.target_HIGH_LOD_obj)
+    if "surface_uv_coordinate" not in High_obj.data.attributes:
+        operator.enable_random_uv_map = True
+        print("No UV attribute")
+
+    hidden_mesh = None
+    cull_inside = False
+    if operator.cull_hidden_strands:
+        surface_obj = getattr(High_obj.data, "surface", None)
+        if surface_obj:
+            hidden_mesh = mesh_triangles(context, surface_obj)
+            cull_inside = is_closed_mesh(*hidden_mesh)
+            if not cull_inside:
+                operator.report({'WARNING'}, "Surface mesh is not closed, only strands within the margin of it are culled.")
+        else:
+            operator.report({'WARNING'}, "No surface mesh set on High LOD curves, hidden strands are not culled.")
+    crop_mesh = None
+    if operator.crop_object != 'NONE':
+        crop_mesh = mesh_triangles(context, bpy.data.objects[operator.crop_object])
+        if not is_closed_mesh(*crop_mesh):
+            operator.report({'WARNING'}, f"Crop mesh '{operator.crop_object}' is not closed, strands are not cropped.")
+            crop_mesh = None
+    uv_rect = None
+    if operator.crop_uv:
+        if "surface_uv_coordinate" in High_obj.data.attributes:
+            uv_rect = (tuple(operator.crop_uv_min), tuple(operator.crop_uv_max))
+        else:
+            operator.report({'WARNING'}, "No UV attribute on High LOD curves, strands are not cropped by UV.")
+    regions = None
+    if hidden_mesh is not None or crop_mesh is not None or uv_rect is not None:
+        crop_invert = operator.crop_invert and (crop_mesh is not None or uv_rect is not None)
+        regions = Regions(hidden_mesh, cull_inside, operator.cull_margin,
+                          crop_mesh, operator.crop_mode, uv_rect, crop_invert)
+
+    try:
+        lod_HIGH, hair_roots, curve_mask = write_strands(
+            operator.target_HIGH_LOD_obj,
+            operator.enable_HIGH_auto_radius,
+            operator.enable_dynamics,
+            operator.invert_roots,
+            seed_for(collection.name, operator.random_seed, RADIUS_HIGH_STREAM),
+            regions,
+            operator.auto_radius_shape)
+        lod_LOW, _, _ = write_strands(
+            operator.target_LOW_LOD_obj,
+            operator.enable_LOW_auto_radius,
+            operator.enable_dynamics,
+            operator.invert_roots,
+            seed_for(collection.name, operator.random_seed, RADIUS_LOW_STREAM),
+            regions,
+            operator.auto_radius_shape)
+    except ValueError as error:
+        operator.report({'ERROR'}, f"Failed to export strands: {error}")
+        return {'CANCELLED'}
+
+    if regions is not None and not len(lod_HIGH.roots):
+        operator.report({'ERROR'}, "No strands left after culling and cropping, nothing exported.")
+        return {'CANCELLED'}
+
+    if operator.enable_random_uv_map:
+        uv_map = random_uv_map(len(lod_HIGH.roots), seed_for(collection.name, operator.random_seed, UV_STREAM))
+    else:
+        uv_map = read_uv_map(High_obj, curve_mask)
+
+    bb_max = collection['Bounding Box Max']
+    bb_min = collection['Bounding Box Min']
+    export_file = encode_strands(
+        lod_HIGH, lod_LOW, uv_map,
+        (bb_max[0], bb_max[2], -bb_max[1]),
+        (bb_min[0], bb_min[2], -bb_min[1]),
+        operator.width_average_prop,
+        operator.width_max_prop,
+        operator.width_min_prop)
+
+    with open(operator.filepath, 'wb') as f:
+        f.write(export_file)
+    operator.report({'INFO'}, f"Exporting hair strands: {collection.name}")
+
+    if operator.create_sbd_file:
+        if not write_sbd(operator, context, High_obj, hair_roots, operator.filepath):
+            return {'CANCELLED'}
+
+    return {'FINISHED'}
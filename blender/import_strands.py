@@ -0,0 +1,147 @@
+# Heavy part of the strands importer, loaded on first operator execution
+import os
+import bpy
+import numpy as np
+from mathutils import Vector
+
+from ..strands.format import read_strands, SEGMENT_ID_MASK, RADIUS_UNSCALE
+
+def create_collection(bb_max, bb_min, width_avg, width_max, width_min, name="NewCollection"):
+    # Check if collection already exists, otherwise create a new one
+    collection = bpy.data.collections.new(name)
+    bpy.context.scene.collection.children.link(collection)
+    print(f"Created new collection: {name}")
+    
+    # Assign color to the collection (works in viewport for Blender 3.x)
+    collection.color_tag = 'COLOR_06'
+    
+    collection["Bounding Box Max"] = Vector([bb_max[0],-bb_max[2],bb_max[1]])
+    collection["Bounding Box Min"] = Vector([bb_min[0],-bb_min[2],bb_min[1]])
+    collection["Width Average"] = width_avg
+    collection["Width Max"] = width_max
+    collection["Width Min"] = width_min
+    return collection
+
+def add_object_to_collection(collection, object):
+    # Get the collection
+    if not collection:
+        raise ValueError(f"Collection '{collection.name}' does not exist!")
+    
+    # Add objects to the collection
+    if object.name not in collection.objects:
+        for col in object.users_collection:
+            col.objects.unlink(object)
+
+        collection.objects.link(object)
+        print(f"Added object '{object.name}' to collection '{collection.name}'")
+    else:
+        print(f"Object '{object.name}' is already in collection '{collection.name}'")
+
+
+def create_curves_object(name,file_path, positions, curve_data, guiding_data, surface_uv_map):
+
+    # Check if the object with the same name exists and delete it if necessary
+    '''existing_obj = bpy.data.objects.get(name)
+    if existing_obj:
+        bpy.data.objects.remove(existing_obj, do_unlink=True)'''
+
+
+    curve_data_block = bpy.data.curves.new(name=name, type="CURVE")
+    curve_data_block.dimensions = '3D'
+    current_points = []
+
+    for index, flag in curve_data:
+        x, y, z, radius = positions[index]
+        if flag == 1:
+            if current_points:
+                add_spline_to_curve(curve_data_block, current_points)
+            current_points = [(x, y, z, radius)]
+        elif flag == 2:
+            current_points.append((x, y, z, radius))
+            x1, y1, z1, radius = positions[index+1]
+            current_points.append((x1, y1, z1, radius))
+
+            add_spline_to_curve(curve_data_block, current_points)
+            current_points = []
+        elif flag == 0:
+            current_points.append((x, y, z, radius))
+
+    if current_points:
+        add_spline_to_curve(curve_data_block, current_points)
+    
+    object_name = os.path.basename(file_path).replace("_strand.strands.20", "")
+    curve_obj = bpy.data.objects.new(name, curve_data_block)
+    bpy.context.collection.objects.link(curve_obj)
+    bpy.context.view_layer.objects.active = curve_obj
+    curve_obj.select_set(True)
+    bpy.ops.object.convert(target='CURVES')
+    bpy.ops.geometry.attribute_add(name="surface_uv_coordinate", domain='CURVE', data_type='FLOAT2')
+    curve_uv_map = curve_obj.data.attributes["surface_uv_coordinate"]
+
+    for idx, curve in enumerate(curve_uv_map.data):
+        curve.vector = surface_uv_map[idx]
+
+    curve_obj.select_set(False)
+
+
+    for collection in bpy.data.collections:
+        if object_name in collection.name:
+            for armature in collection.objects:
+                if object_name+" Armature" in armature.name:
+                    if armature.type == 'ARMATURE':
+                        objects_with_armature_parent = [obj for obj in bpy.context.scene.objects if obj.parent == armature]
+                        for obj in objects_with_armature_parent:
+                            curve_obj.parent = obj
+                            curve_obj.data.surface = obj
+                            curve_obj.data.surface_uv_map = obj.data.uv_layers[0].name
+    
+
+    return curve_obj
+
+def add_spline_to_curve(curve_data_block, points):
+    spline = curve_data_block.splines.new(type='POLY')
+    spline.points.add(len(points) - 1)
+    for i, (x, y, z, radius) in enumerate(points):
+        spline.points[i].co = (x, y, z, 1)
+        spline.points[i].radius = radius
+
+def lod_to_lists(lod):
+    # Blender space (x, -z, y) positions with radius, plus (point_id, flag) segment entries
+    xyz = lod.points["position"]
+    positions = np.column_stack((xyz[:, 0], -xyz[:, 2], xyz[:, 1],
+                                 lod.points["radius"] / RADIUS_UNSCALE)).tolist()
+    curve_entries = list(zip((lod.segments & SEGMENT_ID_MASK).tolist(),
+                             ((lod.segments >> 28) & 0xF).tolist()))
+    return positions, curve_entries
+
+def load(operator, context, filepath):
+    with open(filepath, "rb") as f:
+        data = f.read()
+    try:
+        strands = read_strands(data)
+    except ValueError:
+        operator.report({"ERROR"}, "Failed to import strands: Not a valid strand file.")
+        return {"CANCELLED"}
+
+    header = strands.header
+    bounding_box_vector_max = Vector(header.bbox_max)
+    bounding_box_vector_min = Vector(header.bbox_min)
+
+    width_avg = (header.width_average,)
+    width_max = (header.width_max,)
+    width_min = (header.width_min,)
+
+    positions_HQ_LOD, curve_entries_HQ_LOD = lod_to_lists(strands.high)
+    positions_LQ_LOD, curve_entries_LQ_LOD = lod_to_lists(strands.low)
+    uv_map_data = strands.uv.tolist()
+
+    object_name = os.path.basename(filepath).replace("_strand.strands.20", "")
+    hq_obj = create_curves_object(object_name+"_" + "HIGH_LOD", filepath, positions_HQ_LOD, curve_entries_HQ_LOD, strands.high.guides, uv_map_data)
+    lq_obj = create_curves_object(object_name+"_" + "LOW_LOD", filepath, positions_LQ_LOD, curve_entries_LQ_LOD, strands.low.guides, uv_map_data)
+    collection_name = os.path.basename(filepath).replace(".20", "")
+    strands_col = create_collection(bounding_box_vector_max, bounding_box_vector_min, width_avg, width_max, width_min, collection_name)
+    add_object_to_collection(strands_col, hq_obj)
+    add_object_to_collection(strands_col, lq_obj)
+
+    operator.report({"INFO"}, "Hair Strands imported successfully.")
+    return {"FINISHED"}
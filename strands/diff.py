@@ -0,0 +1,182 @@
+# Section-level structural diff of two .strands.20 files, no bpy required
+import argparse
+import sys
+from collections import namedtuple
+
+import numpy as np
+
+from .format import SEGMENT_ID_MASK, load_strands
+
+# One compared quantity. mismatches and max_error are None when the
+# entry counts differ and entries cannot be paired up.
+SectionDiff = namedtuple("SectionDiff", ["name", "count_a", "count_b", "mismatches", "max_error"])
+# header: (field, a, b) for every differing header field
+# strands: LOD name -> indices of strands with any mismatch, None when the
+# strand layouts differ
+StrandsDiff = namedtuple("StrandsDiff", ["header", "sections", "strands"])
+
+
+def _compare(name, a, b, tolerance=0.0, distance=None):
+    """Per-entry mismatch mask and the SectionDiff for two aligned arrays.
+
+    NaN errors always count as mismatches. With zero tolerance entries are
+    compared bit for bit, so NaN payloads and -0.0 against 0.0 differ too.
+    max_error ignores NaN entries (NaN when every entry is NaN).
+    """
+    if len(a) != len(b):
+        return None, SectionDiff(name, len(a), len(b), None, None)
+    if distance is not None:
+        error = distance(a, b)
+    else:
+        error = np.abs(a.astype(np.float64) - b.astype(np.float64))
+        if error.ndim > 1:
+            error = _reduce_rows(np.maximum, error)
+    if tolerance == 0 and a.dtype == b.dtype:
+        bits = np.dtype(f"u{a.dtype.itemsize}")
+        mismatch = a.view(bits) != b.view(bits)
+        if mismatch.ndim > 1:
+            mismatch = _reduce_rows(np.logical_or, mismatch)
+    else:
+        mismatch = ~(error <= tolerance)
+    # fmax skips NaN, the result is only NaN when every entry is
+    max_error = float(np.fmax.reduce(error)) if len(error) else 0.0
+    return mismatch, SectionDiff(name, len(a), len(b), int(np.count_nonzero(mismatch)), max_error)
+
+
+def _reduce_rows(ufunc, values):
+    # Column by column, much faster than reducing a short last axis
+    result = values[:, 0].copy()
+    for column in range(1, values.shape[1]):
+        ufunc(result, values[:, column], out=result)
+    return result
+
+
+def _euclidean(a, b):
+    delta = a.astype(np.float64) - b.astype(np.float64)
+    return np.sqrt(np.einsum("ij,ij->i", delta, delta))
+
+
+def _diff_lod(name, a, b, tolerance):
+    sections = []
+    point_masks = []
+
+    def compare(label, a_values, b_values, per_point=True, **kwargs):
+        mismatch, section = _compare(f"{name}.{label}", a_values, b_values, **kwargs)
+        sections.append(section)
+        if per_point and mismatch is not None:
+            point_masks.append(mismatch)
+        return mismatch
+
+    compare("positions", a.points["position"], b.points["position"],
+            tolerance=tolerance, distance=_euclidean)
+    compare("radius", a.points["radius"], b.points["radius"])
+    compare("curve_position", a.points["curve_position"], b.points["curve_position"])
+    compare("color", a.points["color"], b.points["color"])
+    segment_ids = compare("segment_ids", a.segments & SEGMENT_ID_MASK, b.segments & SEGMENT_ID_MASK,
+                          per_point=False)
+    segment_flags = compare("segment_flags", a.segments >> 28, b.segments >> 28, per_point=False)
+    compare("roots", a.roots, b.roots, per_point=False)
+    compare("point_curves", a.point_curves, b.point_curves)
+    compare("guide_curves", a.guides["curve_idx"], b.guides["curve_idx"])
+    compare("guide_points", a.guides["point_idx"], b.guides["point_idx"])
+    compare("guide_weights", a.guides["weight"], b.guides["weight"])
+    compare("guide_bouncy", a.guides["bouncy"], b.guides["bouncy"])
+
+    # Strand indices only make sense when both files share a layout
+    if not np.array_equal(a.roots, b.roots) or len(a.points) != len(b.points):
+        return sections, None
+    point_mask = np.zeros(len(a.points), dtype=bool)
+    for mask in point_masks:
+        point_mask |= mask
+    strand_of_point = np.searchsorted(a.roots, np.arange(len(a.points)), side="right") - 1
+    strand_mask = np.zeros(len(a.roots), dtype=bool)
+    strand_mask[strand_of_point[point_mask]] = True
+    if segment_ids is not None:
+        segment_points = (a.segments & SEGMENT_ID_MASK)[segment_ids | segment_flags]
+        segment_points = segment_points[segment_points < len(a.points)]
+        strand_mask[strand_of_point[segment_points]] = True
+    return sections, strand_mask
+
+
+def diff_strands(a, b, tolerance=0.0, uv_tolerance=0.0):
+    """Compare two StrandsFile objects section by section.
+
+    tolerance    -- allowed positional error per point, in game units
+    uv_tolerance -- allowed drift per UV component
+    """
+    header = [(field, x, y) for field, x, y in zip(a.header._fields, a.header, b.header) if x != y]
+    sections = []
+    strands = {}
+    for name in ("high", "low"):
+        lod_sections, strand_mask = _diff_lod(name, getattr(a, name), getattr(b, name), tolerance)
+        sections += lod_sections
+        strands[name] = strand_mask
+
+    uv_mismatch, uv_section = _compare("uv", a.uv, b.uv, tolerance=uv_tolerance)
+    sections.append(uv_section)
+    if strands["high"] is not None and uv_mismatch is not None and len(uv_mismatch) == len(strands["high"]):
+        strands["high"] |= uv_mismatch
+
+    strands = {name: None if mask is None else np.flatnonzero(mask) for name, mask in strands.items()}
+    return StrandsDiff(header, sections, strands)
+
+
+def diff_files(path_a, path_b, tolerance=0.0, uv_tolerance=0.0):
+    return diff_strands(load_strands(path_a), load_strands(path_b), tolerance, uv_tolerance)
+
+
+def is_identical(diff):
+    return not diff.header and all(
+        s.count_a == s.count_b and not s.mismatches for s in diff.sections)
+
+
+def format_report(diff, list_strands=False, max_listed=50):
+    lines = []
+    if diff.header:
+        lines.append(f"header: {len(diff.header)} field(s) differ")
+        for field, a, b in diff.header:
+            lines.append(f"  {field}: {a} != {b}")
+    else:
+        lines.append("header: identical")
+
+    for s in diff.sections:
+        if s.mismatches is None:
+            lines.append(f"{s.name:<20} count {s.count_a} != {s.count_b}")
+        elif s.mismatches:
+            lines.append(f"{s.name:<20} {s.mismatches}/{s.count_a} differ, max error {s.max_error:.6g}")
+
+    for name, indices in diff.strands.items():
+        if indices is None:
+            lines.append(f"{name} strands: layouts differ, not compared per strand")
+        elif len(indices):
+            lines.append(f"{name} strands: {len(indices)} mismatched")
+            if list_strands:
+                shown = " ".join(str(i) for i in indices[:max_listed])
+                more = f" ... (+{len(indices) - max_listed})" if len(indices) > max_listed else ""
+                lines.append(f"  {shown}{more}")
+
+    lines.append("identical" if is_identical(diff) else "different")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two RE4R .strands.20 files section by section")
+    parser.add_argument("a", help="reference .strands.20 file")
+    parser.add_argument("b", help=".strands.20 file to compare")
+    parser.add_argument("--tolerance", type=float, default=0.0, help="allowed positional error per point")
+    parser.add_argument("--uv-tolerance", type=float, default=0.0, help="allowed UV drift per component")
+    parser.add_argument("--strands", action="store_true", help="list mismatched strand indices")
+    parser.add_argument("--max-listed", type=int, default=50, help="strand indices listed per LOD")
+    args = parser.parse_args(argv)
+    try:
+        diff = diff_files(args.a, args.b, args.tolerance, args.uv_tolerance)
+    except (OSError, ValueError) as error:
+        # Distinct from "files differ" so CI can tell a broken input apart
+        print(f"error: {error}", file=sys.stderr)
+        return 2
+    print(format_report(diff, args.strands, args.max_listed))
+    return 0 if is_identical(diff) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+# Reader and encoder for RE4R hair strands files (.strands.20), no bpy required
+import struct
+from collections import namedtuple
+
+import numpy as np
+
+MAGIC = b"STRD"
+
+HEADER = struct.Struct("<4s8xII8xII8xII8xII8xII8xIIII3f3f8xII28x3f")
+HEADER_SIZE = HEADER.size  # 188
+
+StrandsHeader = namedtuple("StrandsHeader", [
+    "magic",
+    "segment_count_high", "segment_count_low",
+    "position_size_high", "position_size_low",
+    "segment_size_high", "segment_size_low",
+    "root_size_high", "root_size_low",
+    "point_size_high", "point_size_low",
+    "segment_blocks_high", "segment_blocks_low",
+    "uv_size", "strand_count",
+    "bbox_max", "bbox_min",
+    "guide_size_high", "guide_size_low",
+    "width_average", "width_max", "width_min",
+])
+
+# One LOD worth of sections, in file order
+StrandsLOD = namedtuple("StrandsLOD", ["points", "segments", "roots", "point_curves", "guides"])
+StrandsFile = namedtuple("StrandsFile", ["header", "high", "low", "uv"])
+
+POINT_DTYPE = np.dtype([
+    ("position", "<f4", 3),
+    ("radius", "<u2"),
+    ("curve_position", "u1"),
+    ("color", "u1"),  # somehow changes color of hair strands
+])
+SEGMENT_DTYPE = np.dtype("<u4")
+ROOT_DTYPE = np.dtype("<u4")
+POINT_CURVE_DTYPE = np.dtype("<u4")
+GUIDE_DTYPE = np.dtype([
+    ("curve_idx", "<u2", 3),
+    ("point_idx", "<u2", 3),
+    ("weight", "<f2", 3),
+    ("bouncy", "<f2", 3),
+])
+UV_DTYPE = np.dtype(("<f4", 2))
+
+SEGMENT_ID_MASK = 0x0FFFFFFF
+SEGMENT_FIRST = 0x10000000
+SEGMENT_LAST = 0x20000000
+NO_GUIDE = 0xFFFF
+
+RADIUS_SCALE = 105000    # export quantization
+RADIUS_UNSCALE = 100000  # import dequantization
+
+_LOD_SECTIONS = (
+    ("points", "position_size", POINT_DTYPE),
+    ("segments", "segment_size", SEGMENT_DTYPE),
+    ("roots", "root_size", ROOT_DTYPE),
+    ("point_curves", "point_size", POINT_CURVE_DTYPE),
+    ("guides", "guide_size", GUIDE_DTYPE),
+)
+
+
+def read_header(data):
+    if len(data) < HEADER_SIZE:
+        raise ValueError("Not a valid strand file: truncated header.")
+    values = HEADER.unpack_from(data)
+    if values[0] != MAGIC:
+        raise ValueError("Not a valid strand file: bad magic.")
+    return StrandsHeader(*values[:15], values[15:18], values[18:21], *values[21:])
+
+
+def read_strands(data):
+    """Parse a whole .strands.20 buffer into numpy section arrays (zero-copy)."""
+    header = read_header(data)
+    offset = HEADER_SIZE
+    lods = []
+    for suffix in ("high", "low"):
+        sections = []
+        for _, size_field, dtype in _LOD_SECTIONS:
+            size = getattr(header, f"{size_field}_{suffix}")
+            sections.append(_read_section(data, offset, size, dtype))
+            offset += size
+        lods.append(StrandsLOD(*sections))
+    uv = _read_section(data, offset, header.uv_size, UV_DTYPE)
+    return StrandsFile(header, lods[0], lods[1], uv)
+
+
+def load_strands(filepath):
+    with open(filepath, "rb") as f:
+        return read_strands(f.read())
+
+
+def _read_section(data, offset, size, dtype):
+    if offset + size > len(data):
+        raise ValueError("Not a valid strand file: section runs past end of file.")
+    return np.frombuffer(data, dtype=dtype, count=size // dtype.itemsize, offset=offset)
+
+
+def select_curves(offsets, curve_mask, *point_arrays):
+    """Keep only curves where curve_mask is set.
+
+    Returns the new curve offsets followed by each per-point array filtered
+    the same way (None entries are passed through).
+    """
+    sizes = np.diff(offsets)
+    point_mask = np.repeat(curve_mask, sizes)
+    new_offsets = np.zeros(int(np.count_nonzero(curve_mask)) + 1, dtype=np.int64)
+    np.cumsum(sizes[curve_mask], out=new_offsets[1:])
+    return (new_offsets, *(None if a is None else a[point_mask] for a in point_arrays))
+
+
+def decimate_curves(offsets, strand_step, point_step):
+    """Point indices and curve offsets of a lighter LOD.
+
+    Keeps every strand_step-th strand and every point_step-th point of it,
+    always including the tip.
+    """
+    if strand_step < 1 or point_step < 1:
+        raise ValueError(f"Decimation steps must be at least 1, got {strand_step} and {point_step}.")
+    offsets = np.asarray(offsets, dtype=np.int64)
+    sizes = np.diff(offsets)[::strand_step]
+    starts = offsets[:-1][::strand_step]
+    kept = (sizes + point_step - 2) // point_step + 1
+    new_offsets = np.zeros(len(kept) + 1, dtype=np.int64)
+    np.cumsum(kept, out=new_offsets[1:])
+    owner = np.repeat(np.arange(len(kept)), kept)
+    j = np.arange(int(new_offsets[-1])) - new_offsets[:-1][owner]
+    index = starts[owner] + np.minimum(j * point_step, sizes[owner] - 1)
+    return index, new_offsets
+
+
+def build_lod(positions, radii, offsets, enable_physic):
+    """Encode one LOD from flat arrays.
+
+    positions -- (N, 3) game-space positions
+    radii     -- (N,) radius per point, in meters
+    offsets   -- (C + 1,) start of each curve in positions, every curve must
+                 have at least two points (see select_curves)
+    Strand and in-strand point indices are stored as 16 bit guide indices,
+    with 0xFFFF reserved for "no guide".
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    sizes = np.diff(offsets)
+    if np.any(sizes < 2):
+        raise ValueError("Every strand needs at least two points.")
+    if len(sizes) > NO_GUIDE:
+        raise ValueError(f"Too many strands: {len(sizes)}, at most {NO_GUIDE} fit in a LOD.")
+    if len(sizes) and sizes.max() > NO_GUIDE:
+        raise ValueError(f"Strand too long: {sizes.max()} points, at most {NO_GUIDE} fit in a strand.")
+    num_points = int(offsets[-1])
+    curve_of_point = np.repeat(np.arange(len(sizes)), sizes)
+    point_ids = np.arange(num_points)
+    j = point_ids - np.repeat(offsets[:-1], sizes)
+    last = sizes[curve_of_point] - 1
+
+    points = np.zeros(num_points, dtype=POINT_DTYPE)
+    points["position"] = positions
+    radii = np.asarray(radii, dtype=np.float64)
+    points["radius"] = np.clip(np.trunc(radii * RADIUS_SCALE), 0, 65535)
+    points["curve_position"] = np.trunc((j / last) * 255)
+
+    in_segment = j != last
+    seg_j = j[in_segment]
+    flags = np.where(seg_j == 0, SEGMENT_FIRST,
+                     np.where(seg_j == last[in_segment] - 1, SEGMENT_LAST, 0))
+    segments = (point_ids[in_segment] + flags).astype(SEGMENT_DTYPE)
+
+    roots = offsets[:-1].astype(ROOT_DTYPE)
+    point_curves = curve_of_point.astype(POINT_CURVE_DTYPE)
+
+    guides = np.zeros(num_points, dtype=GUIDE_DTYPE)
+    guides["curve_idx"] = NO_GUIDE
+    guides["point_idx"] = NO_GUIDE
+    guides["curve_idx"][:, 0] = curve_of_point
+    guides["point_idx"][:, 0] = j
+    guides["weight"][:, 0] = 1 if enable_physic else 0
+
+    return StrandsLOD(points, segments, roots, point_curves, guides)
+
+
+def _strands_chunks(high, low, uv, bbox_max, bbox_min, width_average, width_max, width_min):
+    uv = np.ascontiguousarray(uv, dtype=np.float32).reshape(-1, 2)
+    sizes = {}
+    for suffix, lod in (("high", high), ("low", low)):
+        for (_, size_field, _), section in zip(_LOD_SECTIONS, lod):
+            sizes[f"{size_field}_{suffix}"] = section.nbytes
+    yield HEADER.pack(
+        MAGIC,
+        len(high.segments), len(low.segments),
+        sizes["position_size_high"], sizes["position_size_low"],
+        sizes["segment_size_high"], sizes["segment_size_low"],
+        sizes["root_size_high"], sizes["root_size_low"],
+        sizes["point_size_high"], sizes["point_size_low"],
+        sizes["segment_size_high"] // 0x10, sizes["segment_size_low"] // 0x10,
+        uv.nbytes, len(high.roots),
+        *bbox_max, *bbox_min,
+        sizes["guide_size_high"], sizes["guide_size_low"],
+        width_average, width_max, width_min,
+    )
+    # Flat byte views, memoryview can't cast shapes like (0, 2)
+    for lod in (high, low):
+        for section in lod:
+            yield memoryview(np.ascontiguousarray(section).reshape(-1)).cast("B")
+    yield memoryview(uv.reshape(-1)).cast("B")
+
+
+def encode_strands(high, low, uv, bbox_max, bbox_min, width_average, width_max, width_min):
+    """Serialize two LODs and the per-strand UVs into a .strands.20 buffer.
+
+    bbox_max/bbox_min are given in game space.
+    """
+    return b"".join(_strands_chunks(high, low, uv, bbox_max, bbox_min, width_average, width_max, width_min))
+
+
+def dump_strands(f, high, low, uv, bbox_max, bbox_min, width_average, width_max, width_min):
+    """Like encode_strands, but write sections straight to a binary file object."""
+    for chunk in _strands_chunks(high, low, uv, bbox_max, bbox_min, width_average, width_max, width_min):
+        f.write(chunk)
@@ -0,0 +1,419 @@
+# Streaming conversion of external polyline hair caches (PLY/OBJ) to .strands.20, no bpy required
+import argparse
+import os
+import sys
+from collections import namedtuple
+
+import numpy as np
+
+from .format import build_lod, decimate_curves, dump_strands, encode_strands, select_curves
+from .profiles import auto_radii, random_uv_map, seed_for, RADIUS_HIGH_STREAM, UV_STREAM
+
+# Bytes read per step, text is parsed one chunk at a time and then dropped
+CHUNK_SIZE = 1 << 22
+
+# Same header widths the export operator falls back to
+DEFAULT_WIDTH_AVERAGE = 0.000005102024806546
+DEFAULT_WIDTH_MAX = 0.000280199252301827
+DEFAULT_WIDTH_MIN = 0.000225486015551724
+
+PLY_TYPES = {
+    b"char": "i1", b"int8": "i1", b"uchar": "u1", b"uint8": "u1",
+    b"short": "i2", b"int16": "i2", b"ushort": "u2", b"uint16": "u2",
+    b"int": "i4", b"int32": "i4", b"uint": "u4", b"uint32": "u4",
+    b"float": "f4", b"float32": "f4", b"double": "f8", b"float64": "f8",
+}
+PLY_STRAND_ELEMENTS = ("strand", "strands", "curve", "curves", "hair")
+PLY_COUNT_PROPERTIES = ("vertex_count", "num_vertices", "point_count", "count", "segments")
+
+_WHITESPACE = np.array([9, 10, 13, 32], dtype=np.uint8)
+
+
+# Flat strand arrays read from a cache file:
+# positions (N, 3) float32 in strand order, offsets (C + 1,) strand starts,
+# radii (N,) or None, uv (C, 2) root UVs or None
+HairCache = namedtuple("HairCache", ["positions", "offsets", "radii", "uv"])
+
+
+def _line_chunks(f, chunk_size=CHUNK_SIZE):
+    # Yield blocks of whole lines, only one block is alive at a time
+    tail = b""
+    while True:
+        block = f.read(chunk_size)
+        if not block:
+            if tail:
+                yield tail + b"\n"
+            return
+        block = tail + block
+        cut = block.rfind(b"\n") + 1
+        tail = block[cut:]
+        if cut:
+            yield block[:cut]
+
+
+def _parse(data, dtype):
+    return np.fromstring(data.tobytes().decode("ascii"), dtype=dtype, sep=" ")
+
+
+def _offsets_from_counts(counts):
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return offsets
+
+
+# OBJ
+
+def read_obj(filepath, chunk_size=CHUNK_SIZE):
+    """Read `v` vertices and `l` polylines from an OBJ file.
+
+    Texture indices in `l v/vt` records are ignored.
+    """
+    vertex_chunks = []
+    index_chunks = []
+    count_chunks = []
+    components = None
+    num_vertices = 0
+    with open(filepath, "rb") as f:
+        for chunk in _line_chunks(f, chunk_size):
+            text = np.frombuffer(chunk, dtype=np.uint8).copy()
+            ends = np.flatnonzero(text == 10)
+            starts = np.concatenate(([0], ends[:-1] + 1))
+            padded = np.append(text, (10, 10))
+            second = padded[starts + 1]
+            keyword_end = (second == 32) | (second == 9)
+            is_v = (text[starts] == ord("v")) & keyword_end
+            is_l = (text[starts] == ord("l")) & keyword_end
+            lengths = ends - starts + 1
+            # Blank out the keyword so the payload is plain numbers
+            text[starts[is_v | is_l]] = 32
+
+            if is_v.any():
+                if components is None:
+                    first = starts[np.argmax(is_v)]
+                    components = len(chunk[first:chunk.find(b"\n", first)].split()) - 1
+                values = _parse(text[np.repeat(is_v, lengths)], np.float64)
+                if len(values) != np.count_nonzero(is_v) * components:
+                    raise ValueError("Inconsistent vertex records in OBJ file.")
+                vertex_chunks.append(values.reshape(-1, components)[:, :3].astype(np.float32))
+
+            if is_l.any():
+                whitespace = np.isin(text, _WHITESPACE)
+                token_start = ~whitespace
+                token_start[1:] &= whitespace[:-1]
+                tokens = np.add.reduceat(token_start.astype(np.int32), starts)[is_l]
+                slash = text == ord("/")
+                if slash.any():
+                    # Blank everything from the first slash to the end of its token
+                    at = np.arange(len(text))
+                    last_slash = np.maximum.accumulate(np.where(slash, at, -1))
+                    last_start = np.maximum.accumulate(np.where(token_start, at, -1))
+                    text[(last_slash >= last_start) & ~whitespace] = 32
+                indices = _parse(text[np.repeat(is_l, lengths)], np.int64)
+                if len(indices) != tokens.sum():
+                    raise ValueError("Unsupported polyline record in OBJ file.")
+                # Negative indices count back from the vertices defined so far
+                before = num_vertices + np.cumsum(is_v)[is_l]
+                before = np.repeat(before, tokens)
+                index_chunks.append(np.where(indices < 0, before + indices, indices - 1))
+                count_chunks.append(tokens)
+
+            num_vertices += int(np.count_nonzero(is_v))
+
+    vertices = np.concatenate(vertex_chunks) if vertex_chunks else np.empty((0, 3), dtype=np.float32)
+    indices = np.concatenate(index_chunks) if index_chunks else np.empty(0, dtype=np.int64)
+    counts = np.concatenate(count_chunks) if count_chunks else np.empty(0, dtype=np.int64)
+    _check_indices(indices, len(vertices), "OBJ polyline", 1)
+    return HairCache(_gather(vertices, indices), _offsets_from_counts(counts), None, None)
+
+
+def _check_indices(indices, num_vertices, what, base=0):
+    # Out of range indices would wrap around or fail deep inside numpy
+    bad = (indices < 0) | (indices >= num_vertices)
+    if bad.any():
+        index = int(indices[np.argmax(bad)]) + base
+        raise ValueError(f"{what} references vertex {index}, the file has {num_vertices} vertices.")
+
+
+def _gather(values, indices):
+    # Most caches list points in strand order already, skip the copy then
+    if len(indices) == len(values) and np.array_equal(indices, np.arange(len(values))):
+        return values
+    return values[indices]
+
+
+# PLY
+
+class _AsciiBody:
+    # Whitespace separated number stream after the PLY header
+    byte_order = "="
+
+    def __init__(self, f, chunk_size):
+        self._chunks = _line_chunks(f, chunk_size)
+        self._values = np.empty(0)
+        self._pos = 0
+
+    def take(self, n):
+        while len(self._values) - self._pos < n:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                raise ValueError("Unexpected end of PLY data.")
+            parsed = _parse(np.frombuffer(chunk, dtype=np.uint8), np.float64)
+            self._values = np.concatenate((self._values[self._pos:], parsed))
+            self._pos = 0
+        values = self._values[self._pos:self._pos + n]
+        self._pos += n
+        return values
+
+    def rows(self, dtype, n):
+        values = self.take(n * len(dtype.names)).reshape(n, -1)
+        rows = np.empty(n, dtype=dtype)
+        for column, name in enumerate(dtype.names):
+            rows[name] = values[:, column]
+        return rows
+
+
+class _BinaryBody:
+
+    def __init__(self, f, byte_order):
+        self._f = f
+        self.byte_order = byte_order
+
+    def take_bytes(self, n):
+        data = self._f.read(n)
+        if len(data) != n:
+            raise ValueError("Unexpected end of PLY data.")
+        return data
+
+    def rows(self, dtype, n):
+        return np.frombuffer(self.take_bytes(n * dtype.itemsize), dtype=dtype)
+
+
+def _read_ply_header(f):
+    if f.readline().strip() != b"ply":
+        raise ValueError("Not a PLY file.")
+    body_format = None
+    elements = []
+    while True:
+        line = f.readline()
+        if not line:
+            raise ValueError("Truncated PLY header.")
+        words = line.split()
+        if not words:
+            continue
+        if words[0] == b"format":
+            body_format = words[1].decode()
+        elif words[0] == b"element":
+            elements.append((words[1].decode(), int(words[2]), []))
+        elif words[0] == b"property":
+            if words[1] == b"list":
+                # (name, item type, count type)
+                elements[-1][2].append((words[4].decode(), PLY_TYPES[words[3]], PLY_TYPES[words[2]]))
+            else:
+                elements[-1][2].append((words[2].decode(), PLY_TYPES[words[1]], None))
+        elif words[0] == b"end_header":
+            return body_format, elements
+
+
+def _read_ply_element(body, count, properties, chunk_rows):
+    """Scalar columns of an element plus (counts, items) of its list property."""
+    columns = {name: np.empty(count, dtype=kind) for name, kind, count_kind in properties if count_kind is None}
+    lists = [p for p in properties if p[2] is not None]
+    if len(lists) > 1:
+        raise ValueError("PLY elements with more than one list property are not supported.")
+
+    if not lists:
+        dtype = np.dtype([(name, body.byte_order + kind) for name, kind, _ in properties])
+        for first in range(0, count, chunk_rows):
+            rows = body.rows(dtype, min(chunk_rows, count - first))
+            for name in columns:
+                columns[name][first:first + len(rows)] = rows[name]
+        return columns, None
+
+    # Rows with a list have variable size and are walked one by one
+    list_name, item_kind, count_kind = lists[0]
+    list_at = [p[0] for p in properties].index(list_name)
+    before, after = properties[:list_at], properties[list_at + 1:]
+    list_counts = np.empty(count, dtype=np.int64)
+    items = []
+    if isinstance(body, _AsciiBody):
+        for row in range(count):
+            head = body.take(len(before) + 1)
+            n = int(head[-1])
+            values = body.take(n + len(after))
+            for (name, _, _), value in zip(before + after, np.concatenate((head[:-1], values[n:]))):
+                columns[name][row] = value
+            list_counts[row] = n
+            items.append(values[:n].astype(item_kind))
+    else:
+        order = body.byte_order
+        head_dtype = np.dtype([(name, order + kind) for name, kind, _ in before] + [("_n", order + count_kind)])
+        tail_dtype = np.dtype([(name, order + kind) for name, kind, _ in after])
+        item_dtype = np.dtype(order + item_kind)
+        for row in range(count):
+            head = np.frombuffer(body.take_bytes(head_dtype.itemsize), dtype=head_dtype)[0]
+            n = int(head["_n"])
+            items.append(np.frombuffer(body.take_bytes(n * item_dtype.itemsize), dtype=item_dtype))
+            tail = np.frombuffer(body.take_bytes(tail_dtype.itemsize), dtype=tail_dtype)[0] if after else None
+            for name, _, _ in before:
+                columns[name][row] = head[name]
+            for name, _, _ in after:
+                columns[name][row] = tail[name]
+            list_counts[row] = n
+    flat = np.concatenate(items).astype(np.int64) if items else np.empty(0, dtype=np.int64)
+    return columns, (list_counts, flat)
+
+
+def read_ply(filepath, chunk_size=CHUNK_SIZE):
+    """Read strands from an ASCII or binary PLY file.
+
+    Expects a `vertex` element with x, y, z (optional radius or width) and a
+    strand element (strand/curve/hair) with either a per-strand point count
+    or a vertex_indices list, plus optional root u, v (or s, t).
+    """
+    with open(filepath, "rb") as f:
+        body_format, elements = _read_ply_header(f)
+        if body_format == "ascii":
+            body = _AsciiBody(f, chunk_size)
+        elif body_format in ("binary_little_endian", "binary_big_endian"):
+            body = _BinaryBody(f, "<" if body_format == "binary_little_endian" else ">")
+        else:
+            raise ValueError(f"Unsupported PLY format: {body_format}")
+
+        vertex = strand = None
+        for name, count, properties in elements:
+            row_size = sum(np.dtype(kind).itemsize for _, kind, _ in properties) or 1
+            columns, lists = _read_ply_element(body, count, properties, max(chunk_size // row_size, 1))
+            if name == "vertex":
+                vertex = columns
+            elif name in PLY_STRAND_ELEMENTS:
+                strand = (columns, lists)
+
+    if vertex is None or not {"x", "y", "z"} <= vertex.keys():
+        raise ValueError("PLY file has no vertex positions.")
+    if strand is None:
+        raise ValueError("PLY file has no strand element.")
+    positions = np.column_stack((vertex["x"], vertex["y"], vertex["z"])).astype(np.float32)
+    if "radius" in vertex:
+        radii = vertex["radius"].astype(np.float64)
+    elif "width" in vertex:
+        radii = vertex["width"].astype(np.float64) / 2
+    else:
+        radii = None
+
+    columns, lists = strand
+    if lists is not None:
+        counts, indices = lists
+        _check_indices(indices, len(positions), "PLY strand")
+        positions = _gather(positions, indices)
+        if radii is not None:
+            radii = _gather(radii, indices)
+    else:
+        count_name = next((n for n in PLY_COUNT_PROPERTIES if n in columns), None)
+        if count_name is None:
+            raise ValueError("PLY strand element has no point count or vertex_indices.")
+        counts = columns[count_name].astype(np.int64)
+        # Some writers store segment counts instead of point counts
+        if count_name == "segments":
+            counts += 1
+        if np.any(counts < 0) or counts.sum() != len(positions):
+            raise ValueError(f"PLY strand point counts add up to {counts.sum()}, "
+                             f"the file has {len(positions)} vertices.")
+
+    uv = None
+    for u_name, v_name in (("u", "v"), ("s", "t")):
+        if u_name in columns and v_name in columns:
+            uv = np.column_stack((columns[u_name], columns[v_name])).astype(np.float32)
+            break
+    return HairCache(positions, _offsets_from_counts(counts), radii, uv)
+
+
+# Conversion
+
+def read_cache(filepath, chunk_size=CHUNK_SIZE):
+    extension = os.path.splitext(filepath)[1].lower()
+    if extension == ".ply":
+        return read_ply(filepath, chunk_size)
+    if extension == ".obj":
+        return read_obj(filepath, chunk_size)
+    raise ValueError(f"Unsupported hair cache format: {extension}")
+
+
+def _encode_args(cache, up_axis="Y", scale=1.0, enable_physic=True,
+                 low_strand_step=2, low_point_step=2, name="", radius_shape="NOISE", seed=0,
+                 width_average=DEFAULT_WIDTH_AVERAGE, width_max=DEFAULT_WIDTH_MAX,
+                 width_min=DEFAULT_WIDTH_MIN):
+    positions = cache.positions
+    if up_axis == "Z":
+        positions = np.column_stack((positions[:, 0], positions[:, 2], -positions[:, 1]))
+    elif up_axis != "Y":
+        raise ValueError(f"Unknown up axis: {up_axis}")
+    positions = positions * np.float32(scale) if scale != 1.0 else positions
+    radii = cache.radii * scale if cache.radii is not None else None
+
+    curve_mask = np.diff(cache.offsets) >= 2
+    offsets, positions, radii = select_curves(cache.offsets, curve_mask, positions, radii)
+    if radii is None:
+        radii = auto_radii(offsets, seed_for(name, seed, RADIUS_HIGH_STREAM), radius_shape)
+    if cache.uv is not None:
+        uv = cache.uv[curve_mask]
+    else:
+        uv = random_uv_map(len(offsets) - 1, seed_for(name, seed, UV_STREAM))
+
+    high = build_lod(positions, radii, offsets, enable_physic)
+    low_index, low_offsets = decimate_curves(offsets, low_strand_step, low_point_step)
+    low = build_lod(positions[low_index], radii[low_index], low_offsets, enable_physic)
+
+    if len(positions):
+        bbox_max, bbox_min = positions.max(axis=0), positions.min(axis=0)
+    else:
+        bbox_max = bbox_min = np.zeros(3)
+    return high, low, uv, bbox_max, bbox_min, width_average, width_max, width_min
+
+
+def encode_cache(cache, **options):
+    """Encode a HairCache as a .strands.20 buffer, LOW LOD decimated from HIGH.
+
+    Game space is Y up, Z up caches are converted like Blender exports (x, z, -y).
+    Options: up_axis, scale, enable_physic, low_strand_step, low_point_step,
+    the width_average/width_max/width_min header values, and radius_shape
+    plus name/seed for generated width and UVs (same input, same bytes).
+    """
+    return encode_strands(*_encode_args(cache, **options))
+
+
+def convert(src_path, dst_path, chunk_size=CHUNK_SIZE, **options):
+    """Stream a PLY/OBJ cache into a .strands.20 file, see encode_cache for options."""
+    options.setdefault("name", os.path.basename(src_path))
+    args = _encode_args(read_cache(src_path, chunk_size), **options)
+    with open(dst_path, "wb") as f:
+        dump_strands(f, *args)
+
+
+def _step(value):
+    step = int(value)
+    if step < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {step}")
+    return step
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert PLY/OBJ polyline hair caches to RE4R .strands.20")
+    parser.add_argument("source", help="input .ply or .obj hair cache")
+    parser.add_argument("output", help="output .strands.20 file")
+    parser.add_argument("--up-axis", choices=("Y", "Z"), default="Y", help="up axis of the cache (default: Y)")
+    parser.add_argument("--scale", type=float, default=1.0, help="scale applied to positions and radius")
+    parser.add_argument("--no-physic", action="store_true", help="disable hair physics per strand")
+    parser.add_argument("--low-strand-step", type=_step, default=2, help="keep every Nth strand in LOW LOD")
+    parser.add_argument("--low-point-step", type=_step, default=2, help="keep every Nth point in LOW LOD")
+    parser.add_argument("--radius-shape", choices=("NOISE", "TAPER", "CONSTANT"), default="NOISE",
+                        help="width profile for caches without radius (default: NOISE)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for generated width and UVs")
+    args = parser.parse_args(argv)
+    convert(args.source, args.output, up_axis=args.up_axis, scale=args.scale,
+            enable_physic=not args.no_physic,
+            low_strand_step=args.low_strand_step, low_point_step=args.low_point_step,
+            radius_shape=args.radius_shape, seed=args.seed)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+# Generated radius and UV data for strands that carry none, no bpy required
+import zlib
+
+import numpy as np
+
+# Recommended width range, in meters
+ROOT_RADIUS = 0.00003
+MIN_RADIUS = 0.00011
+MAX_RADIUS = 0.00015
+
+# Independent random streams derived from one seed
+RADIUS_HIGH_STREAM = 0
+RADIUS_LOW_STREAM = 1
+UV_STREAM = 2
+
+
+def seed_for(name, seed, stream):
+    """Reproducible generator seed for one array of one named groom.
+
+    Uses crc32, not hash(), so the value is stable across Python sessions.
+    """
+    return [zlib.crc32(name.encode("utf-8")), seed, stream]
+
+
+def _generator(seed):
+    # An unseeded generator would make exports differ run to run
+    if seed is None:
+        raise ValueError("A seed is required for generated data, see seed_for.")
+    return np.random.default_rng(seed)
+
+
+def auto_radii(offsets, seed, shape="NOISE"):
+    """Radius for every point of the curves in offsets, computed in one pass.
+
+    seed  -- generator seed, usually from seed_for. Required so that no
+             caller falls back to an unseeded generator by accident
+    shape -- "NOISE" (random per point, thin root and tip), "TAPER" (root to
+             tip falloff) or "CONSTANT"
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    num_points = int(offsets[-1])
+    if shape == "CONSTANT":
+        return np.full(num_points, (MIN_RADIUS + MAX_RADIUS) / 2)
+    if shape == "TAPER":
+        sizes = np.diff(offsets)
+        j = np.arange(num_points) - np.repeat(offsets[:-1], sizes)
+        t = j / np.maximum(np.repeat(sizes, sizes) - 1, 1)
+        return MAX_RADIUS + (ROOT_RADIUS - MAX_RADIUS) * t
+    if shape == "NOISE":
+        radii = _generator(seed).uniform(MIN_RADIUS, MAX_RADIUS, num_points)
+        radii[offsets[:-1]] = ROOT_RADIUS
+        radii[offsets[1:] - 1] = ROOT_RADIUS
+        return radii
+    raise ValueError(f"Unknown radius shape: {shape}")
+
+
+def random_uv_map(count, seed):
+    return _generator(seed).random((count, 2))
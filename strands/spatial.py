@@ -0,0 +1,352 @@
+# Uniform grid index over strand points for crop/cull/selection queries, no bpy required
+import numpy as np
+
+# Triangles / points handled per batch in mesh queries, bounds the candidate pair arrays
+QUERY_CHUNK = 2048
+POINT_CHUNK = 1 << 18
+PAIR_CHUNK = 1 << 22
+# Segments whose bounds span more cells than this skip the grid
+LONG_SEGMENT_CELLS = 64
+
+
+class _CellTable:
+    """Sparse uniform grid listing the boxes that overlap each cell.
+
+    Boxes are (lo, hi) corners, hi=None bins points (each in exactly one cell).
+    Only occupied cells are stored, so memory stays O(boxes) for any cell size.
+    """
+
+    def __init__(self, origin, cell_size, dims, lo, hi=None):
+        self.origin = origin
+        self.cell_size = cell_size
+        self.dims = dims
+        if hi is None:
+            box, keys = np.arange(len(lo)), self._cell_keys(self._cell_coords(lo))
+        else:
+            box, keys = self._box_keys(lo, hi)
+        order = np.argsort(keys, kind="stable")
+        self.keys, starts = np.unique(keys[order], return_index=True)
+        self.starts = np.append(starts, len(keys))
+        self.items = box[order]
+
+    def _cell_coords(self, points):
+        return np.floor((points - self.origin) / self.cell_size).astype(np.int64)
+
+    def _cell_keys(self, cells):
+        return (cells[:, 0] * self.dims[1] + cells[:, 1]) * self.dims[2] + cells[:, 2]
+
+    def _box_keys(self, lo, hi):
+        # (box_idx, cell key) for every cell overlapping each box
+        clo = self._cell_coords(lo)
+        chi = self._cell_coords(hi)
+        valid = np.all((chi >= 0) & (clo < self.dims) & (chi >= clo), axis=1)
+        clo = np.clip(clo, 0, self.dims - 1)
+        chi = np.clip(chi, 0, self.dims - 1)
+        extent = chi - clo + 1
+        box, local = _expand_ranges(np.where(valid, extent.prod(axis=1), 0))
+        ext = extent[box]
+        cells = clo[box] + np.stack((local // (ext[:, 1] * ext[:, 2]),
+                                     (local // ext[:, 2]) % ext[:, 1],
+                                     local % ext[:, 2]), axis=1)
+        return box, self._cell_keys(cells)
+
+    def query(self, lo, hi):
+        """(box_idx, item_idx) pairs for items in cells overlapping each box."""
+        box, keys = self._box_keys(lo, hi)
+        slot = np.searchsorted(self.keys, keys)
+        found = slot < len(self.keys)
+        found[found] = self.keys[slot[found]] == keys[found]
+        box = box[found]
+        slot = slot[found]
+
+        starts = self.starts[slot]
+        owner, local = _expand_ranges(self.starts[slot + 1] - starts)
+        return box[owner], self.items[starts[owner] + local]
+
+
+class StrandGrid:
+    """Sparse uniform grid over the points of a groom.
+
+    positions -- (N, 3) point positions, every query uses the same space
+    offsets   -- (C + 1,) start of each curve in positions
+    Only occupied cells are stored, so memory stays O(N) for any cell size.
+    Segments get a coarser grid of their own, see segments_crossing_mesh.
+    """
+
+    def __init__(self, positions, offsets, cell_size=None, points_per_cell=8):
+        self.positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.sizes = np.diff(self.offsets)
+        self.point_curves = np.repeat(np.arange(len(self.sizes)), self.sizes)
+        # Every point but a strand tip starts a segment to the next point
+        self.segment_starts = np.ones(len(self.point_curves), dtype=bool)
+        self.segment_starts[self.offsets[1:][self.sizes > 0] - 1] = False
+
+        num_points = len(self.positions)
+        if num_points:
+            self.origin = self.positions.min(axis=0)
+            self.extent = self.positions.max(axis=0) - self.origin
+        else:
+            self.origin = np.zeros(3)
+            self.extent = np.zeros(3)
+        if cell_size is None:
+            # Flat grooms still get a sensible cell from their two real axes
+            padded = np.maximum(self.extent, max(self.extent.max() * 1e-3, 1e-6))
+            cell_size = (padded.prod() * points_per_cell / max(num_points, 1)) ** (1.0 / 3.0)
+        self.cell_size = float(cell_size)
+        self.dims = (self.extent // self.cell_size).astype(np.int64) + 1
+        self._points = _CellTable(self.origin, self.cell_size, self.dims, self.positions)
+
+    def _candidates(self, lo, hi):
+        """(box_idx, point_idx) pairs for points in cells overlapping each box."""
+        return self._points.query(lo, hi)
+
+    def points_near_mesh(self, vertices, triangles, distance):
+        """Points within distance of any triangle of the mesh."""
+        tris = np.asarray(vertices, dtype=np.float64)[np.asarray(triangles)]
+        near = np.zeros(len(self.positions), dtype=bool)
+        for first in range(0, len(tris), QUERY_CHUNK):
+            chunk = tris[first:first + QUERY_CHUNK]
+            lo = chunk.min(axis=1) - distance
+            hi = chunk.max(axis=1) + distance
+            tri, point = self._candidates(lo, hi)
+            pending = ~near[point]
+            tri, point = tri[pending], point[pending]
+            tri, point = _in_bounds(self.positions, tri, point, lo, hi)
+            tri_points = chunk[tri]
+            dist_sq = _triangle_distance_sq(self.positions[point], tri_points[:, 0], tri_points[:, 1], tri_points[:, 2])
+            near[point[dist_sq <= distance * distance]] = True
+        return near
+
+    def segments_crossing_mesh(self, vertices, triangles):
+        """Segments that cross a triangle of the mesh, flagged at their start point.
+
+        Segments are binned on their own grid with cells about one segment
+        wide. The few spanning more than LONG_SEGMENT_CELLS of those cells
+        are tested against every triangle instead.
+        """
+        tris = np.asarray(vertices, dtype=np.float64)[np.asarray(triangles)]
+        crossing = np.zeros(len(self.positions), dtype=bool)
+        starts = np.flatnonzero(self.segment_starts)
+        if not len(tris) or not len(starts):
+            return crossing
+        seg_lo = np.minimum(self.positions[starts], self.positions[starts + 1])
+        seg_hi = np.maximum(self.positions[starts], self.positions[starts + 1])
+        tri_lo = tris.min(axis=1)
+        tri_hi = tris.max(axis=1)
+
+        def test(seg, tri):
+            overlap = np.all((seg_lo[seg] <= tri_hi[tri]) & (seg_hi[seg] >= tri_lo[tri]), axis=1)
+            seg, tri = seg[overlap], tri[overlap]
+            point = starts[seg]
+            hit = _segment_hits_triangle(self.positions[point], self.positions[point + 1], tris[tri])
+            crossing[point[hit]] = True
+
+        cell_size = max(float(np.median((seg_hi - seg_lo).max(axis=1))), self.cell_size)
+        dims = (self.extent // cell_size).astype(np.int64) + 1
+        span = np.floor((seg_hi - self.origin) / cell_size) - np.floor((seg_lo - self.origin) / cell_size) + 1
+        long = span.prod(axis=1) > LONG_SEGMENT_CELLS
+        binned = np.flatnonzero(~long)
+        cells = _CellTable(self.origin, cell_size, dims, seg_lo[binned], seg_hi[binned])
+        for first in range(0, len(tris), QUERY_CHUNK):
+            tri, seg = cells.query(tri_lo[first:first + QUERY_CHUNK], tri_hi[first:first + QUERY_CHUNK])
+            seg = binned[seg]
+            pending = ~crossing[starts[seg]]
+            test(seg[pending], tri[pending] + first)
+
+        long = np.flatnonzero(long)
+        step = max(PAIR_CHUNK // len(tris), 1)
+        for first in range(0, len(long), step):
+            seg = np.repeat(long[first:first + step], len(tris))
+            test(seg, np.tile(np.arange(len(tris)), len(seg) // len(tris)))
+        return crossing
+
+    def points_inside_mesh(self, vertices, triangles):
+        """Points enclosed by a closed mesh, by +Z ray crossing parity.
+
+        Parity is meaningless for open meshes, check is_closed_mesh first.
+        """
+        tris = np.asarray(vertices, dtype=np.float64)[np.asarray(triangles)]
+        num_points = len(self.positions)
+        if not len(tris) or not num_points:
+            return np.zeros(num_points, dtype=bool)
+        lo = tris.min(axis=1)
+        hi = tris.max(axis=1)
+        ray_lo = lo.copy()
+        ray_lo[:, 2] = -np.inf
+
+        # A ray only meets triangles over its XY column, so bin triangles into
+        # columns a fraction of a triangle wide (capped at a few per point) and
+        # look each point up once.
+        span = self.positions[:, :2].max(axis=0) - self.origin[:2]
+        column = max(float(np.median(hi[:, :2] - lo[:, :2])) / 4,
+                     float(np.sqrt(span.prod() / (4 * num_points))),
+                     self.cell_size * 1e-3)
+        dims = (span // column).astype(np.int64) + 1
+        clo = np.clip(((lo[:, :2] - self.origin[:2]) // column).astype(np.int64), 0, dims - 1)
+        chi = np.clip(((hi[:, :2] - self.origin[:2]) // column).astype(np.int64), 0, dims - 1)
+        extent = chi - clo + 1
+        tri, local = _expand_ranges(extent.prod(axis=1))
+        keys = (clo[tri, 0] + local // extent[tri, 1]) * dims[1] + clo[tri, 1] + local % extent[tri, 1]
+        order = np.argsort(keys, kind="stable")
+        tri = tri[order]
+        starts = np.searchsorted(keys[order], np.arange(dims.prod() + 1))
+
+        crossings = np.zeros(num_points, dtype=np.int64)
+        for first in range(0, num_points, POINT_CHUNK):
+            p = self.positions[first:first + POINT_CHUNK]
+            cols = ((p[:, :2] - self.origin[:2]) // column).astype(np.int64)
+            key = cols[:, 0] * dims[1] + cols[:, 1]
+            point, local = _expand_ranges(starts[key + 1] - starts[key])
+            pair_tri = tri[starts[key[point]] + local]
+            pair_tri, point = _in_bounds(p, pair_tri, point, ray_lo, hi)
+            hit = _ray_hits_triangle(p[point], tris[pair_tri])
+            crossings[first:first + POINT_CHUNK] = np.bincount(point[hit], minlength=len(p))
+        return crossings % 2 == 1
+
+    def strands_where(self, point_mask, mode="any"):
+        """Reduce a per-point mask to a per-strand mask.
+
+        mode -- "any" point, "all" points or only the "root" point
+        """
+        if mode == "root":
+            return point_mask[self.offsets[:-1]]
+        counts = np.bincount(self.point_curves[point_mask], minlength=len(self.sizes))
+        if mode == "all":
+            return counts == self.sizes
+        if mode == "any":
+            return counts > 0
+        raise ValueError(f"Unknown strand mode: {mode}")
+
+
+def strands_in_uv_rect(uv, lo, hi):
+    """Strands whose root UV lies inside the [lo, hi] rectangle."""
+    return np.all((uv >= lo) & (uv <= hi), axis=1)
+
+
+def is_closed_mesh(vertices, triangles):
+    """True when every triangle edge is shared by exactly two triangles.
+
+    Vertices are welded by position first, so meshes split at UV seams count.
+    """
+    if not len(triangles):
+        return False
+    _, welded = np.unique(np.asarray(vertices), axis=0, return_inverse=True)
+    tris = welded.reshape(-1)[np.asarray(triangles)]
+    edges = np.sort(tris[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2), axis=1)
+    _, counts = np.unique(edges, axis=0, return_counts=True)
+    return bool(np.all(counts == 2))
+
+
+def _expand_ranges(counts):
+    # Flatten variable-length ranges into (owner, index within range) pairs
+    owner = np.repeat(np.arange(len(counts)), counts)
+    local = np.arange(len(owner)) - np.repeat(np.cumsum(counts) - counts, counts)
+    return owner, local
+
+
+def _in_bounds(positions, box, point, lo, hi):
+    # Cells are coarser than boxes, drop candidate pairs outside the exact box first
+    p = positions[point]
+    inside = np.all((p >= lo[box]) & (p <= hi[box]), axis=1)
+    return box[inside], point[inside]
+
+
+def _dot(a, b):
+    return np.einsum("ij,ij->i", a, b)
+
+
+def _triangle_distance_sq(p, a, b, c):
+    # Closest point on triangle (Ericson, Real-Time Collision Detection 5.1.5), vectorized
+    ab = b - a
+    ac = c - a
+    ap = p - a
+    bp = p - b
+    cp = p - c
+    d1, d2 = _dot(ab, ap), _dot(ac, ap)
+    d3, d4 = _dot(ab, bp), _dot(ac, bp)
+    d5, d6 = _dot(ab, cp), _dot(ac, cp)
+    va = d3 * d6 - d5 * d4
+    vb = d5 * d2 - d1 * d6
+    vc = d1 * d4 - d3 * d2
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        denom = va + vb + vc
+        closest = a + ab * (vb / denom)[:, None] + ac * (vc / denom)[:, None]
+        # Voronoi regions from lowest to highest priority, later ones win
+        regions = [(
+            (va <= 0) & (d4 - d3 >= 0) & (d5 - d6 >= 0),
+            b + (c - b) * ((d4 - d3) / ((d4 - d3) + (d5 - d6)))[:, None],
+        ), (
+            (vb <= 0) & (d2 >= 0) & (d6 <= 0),
+            a + ac * (d2 / (d2 - d6))[:, None],
+        ), (
+            (d6 >= 0) & (d5 <= d6),
+            c,
+        ), (
+            (vc <= 0) & (d1 >= 0) & (d3 <= 0),
+            a + ab * (d1 / (d1 - d3))[:, None],
+        ), (
+            (d3 >= 0) & (d4 <= d3),
+            b,
+        ), (
+            (d1 <= 0) & (d2 <= 0),
+            a,
+        )]
+        for mask, point in regions:
+            closest = np.where(mask[:, None], point, closest)
+    delta = p - closest
+    return _dot(delta, delta)
+
+
+def _segment_hits_triangle(p, q, tris):
+    # Does each segment p -> q cross its paired triangle (Moller-Trumbore)
+    a, b, c = tris[:, 0], tris[:, 1], tris[:, 2]
+    ab = b - a
+    ac = c - a
+    d = q - p
+    h = np.cross(d, ac)
+    det = _dot(ab, h)
+    ap = p - a
+    k = np.cross(ap, ab)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        u = _dot(ap, h) / det
+        v = _dot(d, k) / det
+        t = _dot(ac, k) / det
+        return (det != 0) & (u >= 0) & (v >= 0) & (u + v <= 1) & (t >= 0) & (t <= 1)
+
+
+def _edge_side(u, v, p):
+    # Twice the signed XY area of (u, v, p), > 0 when p is left of u -> v. The
+    # endpoints are put in a canonical order first, so two triangles sharing
+    # an edge get exactly opposite values and agree on which side p is.
+    (ux, uy), (vx, vy), (px, py) = u[:2], v[:2], p[:2]
+    swap = (ux > vx) | ((ux == vx) & (uy > vy))
+    lx, ly = np.where(swap, vx, ux), np.where(swap, vy, uy)
+    hx, hy = np.where(swap, ux, vx), np.where(swap, uy, vy)
+    side = (hx - lx) * (py - ly) - (hy - ly) * (px - lx)
+    return np.where(swap, -side, side)
+
+
+def _ray_hits_triangle(p, tris):
+    # Does a +Z ray from each point cross its paired triangle. Rays through a
+    # shared edge or vertex must hit exactly one of the triangles around it,
+    # so points on an edge only count for the side that owns it (top-left rule).
+    a, b, c = tris[:, 0].T, tris[:, 1].T, tris[:, 2].T
+    p = p.T
+    det = (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+    flip = det < 0
+    inside = det != 0
+    weights = []
+    for u, v in ((b, c), (c, a), (a, b)):
+        w = _edge_side(u, v, p)
+        dx = v[0] - u[0]
+        dy = v[1] - u[1]
+        w, dx, dy = (np.where(flip, -x, x) for x in (w, dx, dy))
+        owned = (dy > 0) | ((dy == 0) & (dx < 0))
+        inside &= (w > 0) | ((w == 0) & owned)
+        weights.append(w)
+    w0, w1, w2 = weights
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = (w0 * a[2] + w1 * b[2] + w2 * c[2]) / (w0 + w1 + w2)
+        return inside & (z > p[2])
@@ -0,0 +1,5 @@
+# Tests import the bpy-free strands package from the addon folder
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
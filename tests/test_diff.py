@@ -0,0 +1,45 @@
+import numpy as np
+
+from strands.diff import main
+from strands.format import build_lod, encode_strands
+
+
+def _write(path, positions):
+    offsets = np.array([0, 2, 4])
+    lod = build_lod(positions, np.full(4, 0.0001), offsets, True)
+    path.write_bytes(encode_strands(lod, lod, np.zeros((2, 2)), (1, 1, 1), (0, 0, 0), 0, 0, 0))
+    return str(path)
+
+
+def test_exit_code(tmp_path):
+    positions = np.arange(12, dtype=np.float32).reshape(4, 3)
+    a = _write(tmp_path / "a.strands.20", positions)
+    b = _write(tmp_path / "b.strands.20", positions)
+    moved = positions.copy()
+    moved[3, 0] += 0.5
+    c = _write(tmp_path / "c.strands.20", moved)
+    assert main([a, b]) == 0
+    assert main([a, c]) == 1
+    assert main([a, c, "--tolerance", "1"]) == 0
+
+
+def test_nan_and_signed_zero_differ(tmp_path):
+    positions = np.zeros((4, 3), dtype=np.float32)
+    a = _write(tmp_path / "a.strands.20", positions)
+    nan = positions.copy()
+    nan[1, 2] = np.nan
+    negative_zero = positions.copy()
+    negative_zero[2, 0] = -0.0
+    assert main([a, _write(tmp_path / "nan.strands.20", nan), "--tolerance", "1"]) == 1
+    assert main([a, _write(tmp_path / "zero.strands.20", negative_zero)]) == 1
+    assert main([a, _write(tmp_path / "zero.strands.20", negative_zero), "--tolerance", "1e-9"]) == 0
+
+
+def test_unreadable_file(tmp_path, capsys):
+    a = _write(tmp_path / "a.strands.20", np.zeros((4, 3), dtype=np.float32))
+    (tmp_path / "bad.strands.20").write_bytes(b"NOPE" + bytes(200))
+    (tmp_path / "short.strands.20").write_bytes((tmp_path / "a.strands.20").read_bytes()[:-10])
+    assert main([a, str(tmp_path / "missing.strands.20")]) == 2
+    assert main([a, str(tmp_path / "bad.strands.20")]) == 2
+    assert main([a, str(tmp_path / "short.strands.20")]) == 2
+    assert "bad magic" in capsys.readouterr().err
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from strands.format import (NO_GUIDE, RADIUS_SCALE, SEGMENT_FIRST, SEGMENT_ID_MASK, SEGMENT_LAST,
+                            build_lod, decimate_curves, encode_strands, read_strands)
+
+
+def _sample():
+    rng = np.random.default_rng(0)
+    offsets = np.array([0, 2, 5, 9])
+    positions = rng.random((9, 3)).astype(np.float32)
+    radii = rng.uniform(0.0001, 0.0002, 9)
+    return positions, radii, offsets
+
+
+def test_round_trip():
+    positions, radii, offsets = _sample()
+    high = build_lod(positions, radii, offsets, True)
+    index, low_offsets = decimate_curves(offsets, 2, 2)
+    low = build_lod(positions[index], radii[index], low_offsets, False)
+    uv = np.array([[0.1, 0.2], [0.3, 0.4], [0.5, 0.6]], dtype=np.float32)
+    data = encode_strands(high, low, uv, (1, 2, 3), (-1, -2, -3), 0.5, 0.75, 0.25)
+
+    strands = read_strands(data)
+    header = strands.header
+    assert header.strand_count == 3
+    assert header.segment_count_high == 6
+    assert header.segment_count_low == len(low.segments)
+    assert header.bbox_max == (1, 2, 3) and header.bbox_min == (-1, -2, -3)
+    assert header.width_max == 0.75
+
+    high_read = strands.high
+    np.testing.assert_array_equal(high_read.points["position"], positions)
+    np.testing.assert_array_equal(high_read.points["radius"], np.trunc(radii * RADIUS_SCALE))
+    np.testing.assert_array_equal(high_read.points["curve_position"], [0, 255, 0, 127, 255, 0, 85, 170, 255])
+    np.testing.assert_array_equal(high_read.roots, offsets[:-1])
+    np.testing.assert_array_equal(high_read.point_curves, [0, 0, 1, 1, 1, 2, 2, 2, 2])
+    np.testing.assert_array_equal(high_read.segments & SEGMENT_ID_MASK, [0, 2, 3, 5, 6, 7])
+    first, last = SEGMENT_FIRST, SEGMENT_LAST
+    np.testing.assert_array_equal(high_read.segments & ~np.uint32(SEGMENT_ID_MASK), [first, first, last, first, 0, last])
+    np.testing.assert_array_equal(high_read.guides["curve_idx"][:, 1], NO_GUIDE)
+    np.testing.assert_array_equal(high_read.guides["weight"][:, 0], 1)
+    np.testing.assert_array_equal(strands.low.guides["weight"][:, 0], 0)
+    np.testing.assert_array_equal(strands.uv, uv)
+
+
+def test_decimate_keeps_tips():
+    index, offsets = decimate_curves(np.array([0, 2, 5, 9]), 2, 2)
+    np.testing.assert_array_equal(index, [0, 1, 5, 7, 8])
+    np.testing.assert_array_equal(offsets, [0, 2, 5])
+
+
+def test_decimate_rejects_zero_step():
+    with pytest.raises(ValueError):
+        decimate_curves(np.array([0, 3]), 0, 1)
+    with pytest.raises(ValueError):
+        decimate_curves(np.array([0, 3]), 1, 0)
+
+
+def _straight_strands(count, size):
+    offsets = np.arange(count + 1) * size
+    return np.zeros((offsets[-1], 3)), np.zeros(offsets[-1]), offsets
+
+
+def test_guide_index_overflow():
+    # Indices stop below the 0xFFFF sentinel at 65535 strands or points per strand
+    assert len(build_lod(*_straight_strands(NO_GUIDE, 2), True).roots) == NO_GUIDE
+    with pytest.raises(ValueError):
+        build_lod(*_straight_strands(NO_GUIDE + 1, 2), True)
+    build_lod(*_straight_strands(1, NO_GUIDE), True)
+    with pytest.raises(ValueError):
+        build_lod(*_straight_strands(1, NO_GUIDE + 1), True)
+
+
+def test_round_trip_without_strands():
+    lod = build_lod(np.empty((0, 3)), np.empty(0), np.zeros(1, dtype=np.int64), True)
+    strands = read_strands(encode_strands(lod, lod, np.empty((0, 2)), (0, 0, 0), (0, 0, 0), 0, 0, 0))
+    assert strands.header.strand_count == 0
+    assert len(strands.high.points) == len(strands.low.roots) == len(strands.uv) == 0
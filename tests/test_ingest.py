@@ -0,0 +1,129 @@
+import numpy as np
+import pytest
+
+from strands.format import load_strands
+from strands.ingest import convert, main, read_obj, read_ply
+
+POSITIONS = np.array([[0, 0, 0], [0, 1, 0], [0, 2, 0],
+                      [1, 0, 0], [1, 1, 0],
+                      [2, 0, 0], [2, 1, 0], [2, 2, 0], [2, 3, 0]], dtype=np.float32)
+OFFSETS = [0, 3, 5, 9]
+
+
+def _write(path, text):
+    path.write_text(text)
+    return str(path)
+
+
+def _obj_vertices(rows):
+    return "".join(f"v {x:g} {y:g} {z:g}\n" for x, y, z in rows)
+
+
+@pytest.mark.parametrize("chunk_size", [7, 64, 1 << 20])
+def test_obj_negative_indices_across_chunks(tmp_path, chunk_size):
+    text = ("# hair\n" + _obj_vertices(POSITIONS[:3]) + "l -3 -2 -1\n"
+            + _obj_vertices(POSITIONS[3:]) + "l 4 5\nl -4 -3 -2 -1\n")
+    cache = read_obj(_write(tmp_path / "hair.obj", text), chunk_size)
+    np.testing.assert_array_equal(cache.positions, POSITIONS)
+    np.testing.assert_array_equal(cache.offsets, OFFSETS)
+
+
+def test_obj_texture_indices_are_ignored(tmp_path):
+    text = _obj_vertices(POSITIONS[:3]) + "vt 0 0\nvt 1 1\nl 1/1 2/2 3/1\n"
+    cache = read_obj(_write(tmp_path / "hair.obj", text), 8)
+    np.testing.assert_array_equal(cache.positions, POSITIONS[:3])
+    np.testing.assert_array_equal(cache.offsets, [0, 3])
+
+
+@pytest.mark.parametrize("record", ["l 0 1 2\n", "l 1 2 10\n", "l -4 -1\n"])
+def test_obj_index_out_of_range(tmp_path, record):
+    text = _obj_vertices(POSITIONS[:3]) + record
+    with pytest.raises(ValueError, match="references vertex"):
+        read_obj(_write(tmp_path / "hair.obj", text))
+
+
+def test_obj_without_polylines(tmp_path):
+    source = _write(tmp_path / "hair.obj", _obj_vertices(POSITIONS))
+    convert(source, str(tmp_path / "empty.strands.20"))
+    assert load_strands(str(tmp_path / "empty.strands.20")).header.strand_count == 0
+
+
+def _ply_header(body_format, strand_properties):
+    return (f"ply\nformat {body_format} 1.0\n"
+            f"element vertex {len(POSITIONS)}\nproperty float x\nproperty float y\nproperty float z\n"
+            f"element strand 3\n{strand_properties}end_header\n")
+
+
+def test_ply_ascii_count(tmp_path):
+    text = (_ply_header("ascii", "property int vertex_count\nproperty float u\nproperty float v\n")
+            + "".join(f"{x:g} {y:g} {z:g}\n" for x, y, z in POSITIONS)
+            + "3 0.1 0.2\n2 0.3 0.4\n4 0.5 0.6\n")
+    cache = read_ply(_write(tmp_path / "hair.ply", text), 16)
+    np.testing.assert_array_equal(cache.positions, POSITIONS)
+    np.testing.assert_array_equal(cache.offsets, OFFSETS)
+    np.testing.assert_allclose(cache.uv, [[0.1, 0.2], [0.3, 0.4], [0.5, 0.6]])
+
+
+def test_ply_ascii_list(tmp_path):
+    # Lists may reference vertices out of strand order
+    order = [5, 6, 7, 8, 0, 1, 2, 3, 4]
+    text = (_ply_header("ascii", "property list uchar int vertex_indices\n")
+            + "".join(f"{x:g} {y:g} {z:g}\n" for x, y, z in POSITIONS[order])
+            + "3 4 5 6\n2 7 8\n4 0 1 2 3\n")
+    cache = read_ply(_write(tmp_path / "hair.ply", text))
+    np.testing.assert_array_equal(cache.positions, POSITIONS)
+    np.testing.assert_array_equal(cache.offsets, OFFSETS)
+
+
+def test_ply_count_mismatch(tmp_path):
+    text = (_ply_header("ascii", "property int vertex_count\n")
+            + "".join(f"{x:g} {y:g} {z:g}\n" for x, y, z in POSITIONS) + "3\n2\n3\n")
+    with pytest.raises(ValueError, match="add up to 8"):
+        read_ply(_write(tmp_path / "hair.ply", text))
+
+
+def test_ply_list_index_out_of_range(tmp_path):
+    text = (_ply_header("ascii", "property list uchar int vertex_indices\n")
+            + "".join(f"{x:g} {y:g} {z:g}\n" for x, y, z in POSITIONS)
+            + "3 0 1 2\n2 3 4\n4 5 6 7 9\n")
+    with pytest.raises(ValueError, match="references vertex 9"):
+        read_ply(_write(tmp_path / "hair.ply", text))
+
+
+@pytest.mark.parametrize("byte_order, tag", [("<", "binary_little_endian"), (">", "binary_big_endian")])
+def test_ply_binary_count(tmp_path, byte_order, tag):
+    path = tmp_path / "hair.ply"
+    path.write_bytes(_ply_header(tag, "property int vertex_count\n").encode()
+                     + POSITIONS.astype(byte_order + "f4").tobytes()
+                     + np.diff(OFFSETS).astype(byte_order + "i4").tobytes())
+    cache = read_ply(str(path), 16)
+    np.testing.assert_array_equal(cache.positions, POSITIONS)
+    np.testing.assert_array_equal(cache.offsets, OFFSETS)
+
+
+def test_ply_binary_list(tmp_path):
+    path = tmp_path / "hair.ply"
+    strands = b"".join(np.uint8(len(indices)).tobytes() + np.array(indices, dtype="<i4").tobytes()
+                       for indices in ([0, 1, 2], [3, 4], [5, 6, 7, 8]))
+    path.write_bytes(_ply_header("binary_little_endian", "property list uchar int vertex_indices\n").encode()
+                     + POSITIONS.astype("<f4").tobytes() + strands)
+    cache = read_ply(str(path))
+    np.testing.assert_array_equal(cache.positions, POSITIONS)
+    np.testing.assert_array_equal(cache.offsets, OFFSETS)
+
+
+def test_convert_is_deterministic(tmp_path):
+    text = _obj_vertices(POSITIONS) + "l 1 2 3\nl 4 5\nl 6 7 8 9\n"
+    source = _write(tmp_path / "hair.obj", text)
+    convert(source, str(tmp_path / "a.strands.20"))
+    convert(source, str(tmp_path / "b.strands.20"))
+    assert (tmp_path / "a.strands.20").read_bytes() == (tmp_path / "b.strands.20").read_bytes()
+    strands = load_strands(str(tmp_path / "a.strands.20"))
+    np.testing.assert_array_equal(strands.high.points["position"], POSITIONS)
+    np.testing.assert_array_equal(strands.low.roots, [0, 2])
+
+
+@pytest.mark.parametrize("option", ["--low-strand-step", "--low-point-step"])
+def test_cli_rejects_zero_step(tmp_path, option):
+    with pytest.raises(SystemExit):
+        main(["hair.obj", str(tmp_path / "out.strands.20"), option, "0"])
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from strands.profiles import (MAX_RADIUS, MIN_RADIUS, RADIUS_HIGH_STREAM, RADIUS_LOW_STREAM, ROOT_RADIUS,
+                              auto_radii, random_uv_map, seed_for)
+
+OFFSETS = np.array([0, 2, 7, 17])
+
+
+def test_same_seed_same_output():
+    seed = seed_for("hair", 3, RADIUS_HIGH_STREAM)
+    again = seed_for("hair", 3, RADIUS_HIGH_STREAM)
+    np.testing.assert_array_equal(auto_radii(OFFSETS, seed), auto_radii(OFFSETS, again))
+    np.testing.assert_array_equal(random_uv_map(5, seed), random_uv_map(5, seed))
+
+
+@pytest.mark.parametrize("other", [seed_for("hair", 3, RADIUS_LOW_STREAM), seed_for("beard", 3, RADIUS_HIGH_STREAM),
+                                   seed_for("hair", 4, RADIUS_HIGH_STREAM)])
+def test_streams_names_and_seeds_differ(other):
+    seed = seed_for("hair", 3, RADIUS_HIGH_STREAM)
+    assert not np.array_equal(auto_radii(OFFSETS, seed), auto_radii(OFFSETS, other))
+    assert not np.array_equal(random_uv_map(5, seed), random_uv_map(5, other))
+
+
+def test_seed_is_required():
+    with pytest.raises(ValueError):
+        auto_radii(OFFSETS, None)
+    with pytest.raises(ValueError):
+        random_uv_map(5, None)
+
+
+def test_noise():
+    radii = auto_radii(OFFSETS, seed_for("hair", 0, RADIUS_HIGH_STREAM), "NOISE")
+    assert len(radii) == OFFSETS[-1]
+    np.testing.assert_array_equal(radii[OFFSETS[:-1]], ROOT_RADIUS)
+    np.testing.assert_array_equal(radii[OFFSETS[1:] - 1], ROOT_RADIUS)
+    inner = np.delete(radii, np.concatenate((OFFSETS[:-1], OFFSETS[1:] - 1)))
+    assert np.all((inner >= MIN_RADIUS) & (inner <= MAX_RADIUS))
+
+
+def test_taper():
+    radii = auto_radii(OFFSETS, seed_for("hair", 0, RADIUS_HIGH_STREAM), "TAPER")
+    for start, end in zip(OFFSETS[:-1], OFFSETS[1:]):
+        strand = radii[start:end]
+        assert np.all(np.diff(strand) < 0)
+        assert strand[0] == pytest.approx(MAX_RADIUS) and strand[-1] == pytest.approx(ROOT_RADIUS)
+
+
+def test_constant():
+    radii = auto_radii(OFFSETS, seed_for("hair", 0, RADIUS_HIGH_STREAM), "CONSTANT")
+    assert len(radii) == OFFSETS[-1]
+    np.testing.assert_array_equal(radii, radii[0])
+
+
+def test_unknown_shape():
+    with pytest.raises(ValueError):
+        auto_radii(OFFSETS, seed_for("hair", 0, RADIUS_HIGH_STREAM), "SPIKY")
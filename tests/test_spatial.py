@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from strands.spatial import StrandGrid, _triangle_distance_sq, is_closed_mesh, strands_in_uv_rect
+
+
+def _cube():
+    vertices = np.array([[x, y, z] for x in (0, 1) for y in (0, 1) for z in (0, 1)], dtype=np.float64)
+    quads = [[0, 1, 3, 2], [4, 6, 7, 5], [0, 4, 5, 1], [2, 3, 7, 6], [0, 2, 6, 4], [1, 5, 7, 3]]
+    triangles = np.array([tri for a, b, c, d in quads for tri in ((a, b, c), (a, c, d))])
+    return vertices, triangles
+
+
+def _octahedron():
+    vertices = np.array([[1, 0, 0], [-1, 0, 0], [0, 1, 0], [0, -1, 0], [0, 0, 1], [0, 0, -1]], dtype=np.float64)
+    triangles = np.array([[0, 2, 4], [2, 1, 4], [1, 3, 4], [3, 0, 4],
+                          [2, 0, 5], [1, 2, 5], [3, 1, 5], [0, 3, 5]])
+    return vertices, triangles
+
+
+def _points(points):
+    points = np.asarray(points, dtype=np.float64)
+    return StrandGrid(points, np.arange(len(points) + 1))
+
+
+def test_closed_mesh():
+    vertices, triangles = _cube()
+    assert is_closed_mesh(vertices, triangles)
+    assert not is_closed_mesh(vertices, triangles[:-1])
+    # A vertex split along a seam still welds back into a closed mesh
+    split = triangles.copy()
+    split[0, 0] = len(vertices)
+    assert is_closed_mesh(np.vstack((vertices, vertices[:1])), split)
+
+
+def test_inside_cube():
+    # Rays from the first points run through the diagonals shared by two triangles
+    grid = _points([[0.5, 0.5, 0.5], [0.3, 0.3, 0.2], [0.25, 0.75, 0.5], [0.7, 0.3, 0.9],
+                    [0.5, 0.5, 1.5], [0.5, 0.5, -0.5], [1.5, 0.5, 0.5], [0.3, 0.3, -1.0]])
+    np.testing.assert_array_equal(grid.points_inside_mesh(*_cube()),
+                                  [True, True, True, True, False, False, False, False])
+
+
+def test_inside_through_shared_vertex():
+    # Rays from these points pass exactly through the apexes shared by four triangles
+    grid = _points([[0, 0, 0], [0, 0, 0.5], [0, 0, -2], [0, 0, 2], [0.2, 0, 0], [0.1, 0.1, 0.1]])
+    np.testing.assert_array_equal(grid.points_inside_mesh(*_octahedron()),
+                                  [True, True, False, False, True, True])
+
+
+def test_near_mesh_matches_brute_force():
+    vertices, triangles = _octahedron()
+    points = np.random.default_rng(0).uniform(-1.5, 1.5, (2000, 3))
+    distance = 0.1
+    tris = vertices[triangles]
+    expected = np.zeros(len(points), dtype=bool)
+    for a, b, c in tris:
+        count = len(points)
+        dist_sq = _triangle_distance_sq(points, np.tile(a, (count, 1)), np.tile(b, (count, 1)), np.tile(c, (count, 1)))
+        expected |= dist_sq <= distance * distance
+    assert expected.any() and not expected.all()
+    np.testing.assert_array_equal(_points(points).points_near_mesh(vertices, triangles, distance), expected)
+
+
+def test_segments_crossing_mesh():
+    # Strand 0 passes straight through the cube with both points outside it
+    points = [[-0.5, 0.5, 0.5], [1.5, 0.5, 0.5],
+              [-1, -1, -1], [-0.5, -0.5, -0.5],
+              [0.4, 0.4, 0.4], [0.6, 0.6, 0.6], [0.6, 0.6, 1.6]]
+    grid = StrandGrid(np.array(points, dtype=np.float64), np.array([0, 2, 4, 7]))
+    crossing = grid.segments_crossing_mesh(*_cube())
+    np.testing.assert_array_equal(crossing, [True, False, False, False, False, True, False])
+    np.testing.assert_array_equal(grid.strands_where(crossing, "any"), [True, False, True])
+
+
+def test_strands_where():
+    grid = StrandGrid(np.zeros((6, 3)), np.array([0, 2, 4, 6]))
+    mask = np.array([True, True, False, True, True, False])
+    np.testing.assert_array_equal(grid.strands_where(mask, "any"), [True, True, True])
+    np.testing.assert_array_equal(grid.strands_where(mask, "all"), [True, False, False])
+    np.testing.assert_array_equal(grid.strands_where(mask, "root"), [True, False, True])
+    with pytest.raises(ValueError):
+        grid.strands_where(mask, "most")
+
+
+def test_uv_rect():
+    uv = np.array([[0.1, 0.9], [0.9, 0.1], [0.5, 0.5]])
+    np.testing.assert_array_equal(strands_in_uv_rect(uv, (0, 0.5), (0.5, 1)), [True, False, True])